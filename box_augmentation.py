@@ -0,0 +1,192 @@
+"""Augmentations that degrade a perfect tracker submission in controlled ways.
+
+Each function takes a ground-truth style DataFrame (frame, id, bb_left, bb_top,
+bb_width, bb_height, ...) and returns a modified copy simulating a typical
+tracker failure mode: spurious boxes, missed detections, localization jitter,
+and identity swaps between overlapping objects.
+"""
+
+import numpy as np
+import pandas as pd
+
+import fast_hota_utils
+
+BOX_COLUMNS = ['bb_left', 'bb_top', 'bb_width', 'bb_height']
+
+# one PCG64 generator shared by every augmentation; cheaper than the legacy
+# global-state np.random entry points and drawn from in bulk
+_rng = np.random.default_rng()
+
+try:
+    import numba
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+if _HAVE_NUMBA:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _iou_and_max_other(xyxy):
+        """Computes the pairwise IoU matrix and, per box, the max IoU with any
+        other box, in one pass without the eye-subtract/row-max temporaries.
+        Boxes arrive as [x1, y1, x2, y2] corners, converted once by the caller."""
+        n = xyxy.shape[0]
+        ious = np.zeros((n, n))
+        max_other = np.zeros(n)
+        for a in numba.prange(n):
+            area_a = (xyxy[a, 2] - xyxy[a, 0]) * (xyxy[a, 3] - xyxy[a, 1])
+            for b in range(n):
+                w = min(xyxy[a, 2], xyxy[b, 2]) - max(xyxy[a, 0], xyxy[b, 0])
+                h = min(xyxy[a, 3], xyxy[b, 3]) - max(xyxy[a, 1], xyxy[b, 1])
+                inter = max(w, 0.0) * max(h, 0.0)
+                area_b = (xyxy[b, 2] - xyxy[b, 0]) * (xyxy[b, 3] - xyxy[b, 1])
+                union = area_a + area_b - inter
+                iou = inter / union if union > 0 else 0.0
+                ious[a, b] = iou
+                if b != a and iou > max_other[a]:
+                    max_other[a] = iou
+        return ious, max_other
+
+    # warm the compile once at import so the first frame does not pay for it
+    _iou_and_max_other(np.zeros((2, 4), dtype=np.float32))
+else:
+    def _iou_and_max_other(xyxy):
+        ious = fast_hota_utils.calculate_box_ious_xyxy(xyxy, xyxy)
+        max_other = (ious - np.eye(xyxy.shape[0])).max(axis=-1)
+        return ious, max_other
+
+
+def add_random_boxes(df, num_boxes_per_frame=2):
+    """Adds random false-positive boxes to every frame.
+
+    Per-frame extents are computed with a single groupby aggregation and all
+    random boxes are drawn in bulk, so the cost is O(N + F) rather than one
+    DataFrame scan per frame.
+    """
+    agg = df.groupby('frame', sort=False).agg(
+        mx=('bb_left', 'max'), mw=('bb_width', 'max'),
+        my=('bb_top', 'max'), mh=('bb_height', 'max'))
+    frames = agg.index.to_numpy()
+    n = num_boxes_per_frame * len(frames)
+
+    # plausible upper bounds for box placement within each frame
+    max_x = (agg['mx'] + agg['mw']).to_numpy()
+    max_y = (agg['my'] + agg['mh']).to_numpy()
+
+    # typed arrays straight into the DataFrame constructor; no per-row dicts
+    # and no dtype inference
+    sizes = _rng.integers(30, 100, size=(n, 2), dtype=np.int32)
+    widths, heights = sizes[:, 0], sizes[:, 1]
+    lefts = _rng.integers(
+        0, np.maximum(1, np.repeat(max_x, num_boxes_per_frame) - widths)).astype(np.int32)
+    tops = _rng.integers(
+        0, np.maximum(1, np.repeat(max_y, num_boxes_per_frame) - heights)).astype(np.int32)
+
+    next_id = int(df['id'].max()) + 1
+    new_df = pd.DataFrame({
+        'frame': np.repeat(frames, num_boxes_per_frame),
+        'id': np.arange(next_id, next_id + n, dtype=np.int32),
+        'bb_left': lefts,
+        'bb_top': tops,
+        'bb_width': widths,
+        'bb_height': heights}, copy=False)
+    for col in df.columns:
+        if col not in new_df.columns:
+            new_df[col] = df[col].iloc[0]
+    return pd.concat([df, new_df[df.columns]], ignore_index=True, copy=False)
+
+
+def _compose_swap_permutation(uniq, swap_pairs):
+    """Composes (src_id, tgt_id) swap pairs into a lookup table over uniq.
+
+    Each pair exchanges the two ids in the table, so the composed mapping is a
+    permutation of the unique ids: tracks can trade labels (including through
+    transitive chains) but two tracks are never merged onto one id, which
+    would break per-frame id uniqueness.
+    """
+    lut = uniq.copy()
+    positions = np.searchsorted(uniq, np.asarray(swap_pairs))
+    for a, b in positions:
+        lut[a], lut[b] = lut[b], lut[a]
+    return lut
+
+
+def augment(df, base_drop_lambda=0.0, base_jitter_lambda=0.0, base_swap_lambda=0.0):
+    """Applies drop, localization-jitter and label-swap errors in one pass.
+
+    The per-frame IoU matrix is the dominant cost of every augmentation, so it
+    is computed once per frame and shared by all three mutations instead of
+    being recomputed by each of them.
+    """
+    # copy up front: the jitter and swap paths write through df, and the
+    # module contract is that callers get a modified copy back
+    df = df.copy()
+    # one hash-group pass instead of a boolean mask over the whole frame column
+    # for every frame; the group values are row positions into the numpy views
+    groups = df.groupby('frame', sort=False).indices
+    box_values = df[BOX_COLUMNS].to_numpy()
+    id_values = df['id'].to_numpy()
+    index_values = df.index.to_numpy()
+
+    drop_ids = []
+    swap_pairs = []
+    for frame, idx in groups.items():
+        ids = index_values[idx]
+        bb1 = box_values[idx].astype(np.float32)
+        # convert corners once per frame; every IoU consumer shares them.
+        # float32 is plenty for pixel coordinates and halves the IoU kernel's
+        # memory traffic
+        xyxy = np.empty_like(bb1)
+        xyxy[:, :2] = bb1[:, :2]
+        xyxy[:, 2:] = bb1[:, :2] + bb1[:, 2:]
+        # max IoU with any *other* box in the frame
+        ious, max_off_diag = _iou_and_max_other(xyxy)
+
+        if base_drop_lambda > 0:
+            drop_mask = _rng.random(len(ids)) < base_drop_lambda * max_off_diag
+            drop_ids.extend(ids[drop_mask].tolist())
+
+        if base_jitter_lambda > 0:
+            jitter_mask = _rng.random(len(ids)) < base_jitter_lambda * max_off_diag
+            g_idx = ids[jitter_mask]
+            if len(g_idx) > 0:
+                jitter_value = int(_rng.integers(2, 8))
+                # mutate all four box columns through a single indexer pass
+                block = bb1[jitter_mask]
+                block += _rng.normal(0, jitter_value, (len(g_idx), 4)).astype(int)
+                block[:, 2:] = np.maximum(block[:, 2:], 10)
+                df.loc[g_idx, BOX_COLUMNS] = block
+
+        if base_swap_lambda > 0:
+            # upper triangle only so each pair is considered once; boxes cannot swap with themselves
+            upper = np.triu(ious - np.eye(len(ids)))
+            swap_mask = (_rng.random(upper.shape) < base_swap_lambda * upper) & (upper > 0)
+            i, j = np.nonzero(swap_mask)
+            if len(i) > 0:
+                ann_ids = id_values[idx]
+                swap_pairs.extend(zip(ann_ids[i].tolist(), ann_ids[j].tolist()))
+
+    if swap_pairs:
+        # permute a unique-id lookup table and gather: O(U) writes + one O(N)
+        # take instead of a hashed map over every row
+        uniq, inv = np.unique(id_values, return_inverse=True)
+        lut = _compose_swap_permutation(uniq, swap_pairs)
+        df['id'] = lut[inv]
+
+    if drop_ids:
+        df = df.drop(index=drop_ids)
+    return df
+
+
+def drop_detections(df, base_drop_lambda=0.1):
+    """Drops detections with probability proportional to how occluded they are."""
+    return augment(df, base_drop_lambda=base_drop_lambda)
+
+
+def inject_localization_error(df, base_jitter_lambda=0.2):
+    """Jitters box coordinates, preferring boxes that overlap other boxes."""
+    return augment(df, base_jitter_lambda=base_jitter_lambda)
+
+
+def inject_label_swaps(df, base_swap_lambda=0.05):
+    """Swaps track ids between pairs of overlapping boxes in the same frame."""
+    return augment(df, base_swap_lambda=base_swap_lambda)
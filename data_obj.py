@@ -0,0 +1,221 @@
+"""Data containers used by the HOTA computation in fast_hota_utils."""
+
+import json
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# orjson serializes ndarrays natively (no tolist() expansion) and is an order
+# of magnitude faster than the stdlib encoder on large nested lists
+try:
+    import orjson
+    _HAVE_ORJSON = True
+except ImportError:
+    _HAVE_ORJSON = False
+
+
+def _dump_json(data, filepath):
+    """Writes data as indented json, preferring orjson when available."""
+    if _HAVE_ORJSON:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
+    else:
+        if isinstance(data, dict):
+            data = {key: (value.tolist() if isinstance(value, np.ndarray) else value)
+                    for key, value in data.items()}
+        with open(filepath, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def _load_json(filepath):
+    """Reads a json file, preferring orjson when available."""
+    if _HAVE_ORJSON:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+class VideoFrameData:
+    """Per-frame slice of the reference and comparison data for one video.
+
+    Column positions are resolved once per video by the caller and carried
+    here, so the per-frame similarity functions index straight into the data
+    arrays instead of re-scanning col_names every frame.
+    """
+
+    def __init__(self, video_id, frame, ref_data, comp_data, col_names,
+                 id_idx, box_idx, pos_idx=None):
+        self.video_id = video_id
+        self.frame = frame
+        self.ref_data = ref_data  # (n, len(col_names)) ndarray of reference rows
+        self.comp_data = comp_data  # (m, len(col_names)) ndarray of comparison rows
+        self.col_names = col_names
+        self.id_idx = id_idx  # position of the 'id' column
+        self.box_idx = box_idx  # positions of the box columns
+        self.pos_idx = pos_idx  # positions of the lat/long columns, when present
+
+
+class CostMatrixData:
+    """Similarity matrix between reference ids (rows) and comparison ids (columns)."""
+
+    def __init__(self, video_id, frame, i_ids, j_ids, cost_matrix):
+        self.video_id = video_id
+        self.frame = frame  # None for clip-level (global) matrices
+        self.i_ids = np.asarray(i_ids)
+        self.j_ids = np.asarray(j_ids)
+        self.cost_matrix = cost_matrix
+        self._ref_id2idx_map = None
+        self._comp_id2idx_map = None
+        self._ref_id2idx = None
+        self._comp_id2idx = None
+
+    def construct_id2idx_arrays(self):
+        """Builds dense id -> compact index lookup tables for both id axes.
+
+        The tables are indexed directly by id (track ids are small non-negative
+        ints), with -1 marking ids absent from this matrix, so an array of ids
+        maps to matrix indices in a single fancy-indexing gather.
+        """
+        if self._ref_id2idx is None:
+            self._ref_id2idx = np.full(int(self.i_ids.max(initial=0)) + 1, -1, dtype=np.int32)
+            self._ref_id2idx[self.i_ids] = np.arange(len(self.i_ids), dtype=np.int32)
+            self._comp_id2idx = np.full(int(self.j_ids.max(initial=0)) + 1, -1, dtype=np.int32)
+            self._comp_id2idx[self.j_ids] = np.arange(len(self.j_ids), dtype=np.int32)
+        return self._ref_id2idx, self._comp_id2idx
+
+    def construct_id2idx_lookup(self):
+        """Builds the id -> row/column index maps."""
+        if self._ref_id2idx_map is None:
+            self._ref_id2idx_map = {int(id_): k for k, id_ in enumerate(self.i_ids)}
+            self._comp_id2idx_map = {int(id_): k for k, id_ in enumerate(self.j_ids)}
+        return self._ref_id2idx_map, self._comp_id2idx_map
+
+    def get_cost(self, i, j):
+        """Returns the similarity between reference id i and comparison id j."""
+        ref_id2idx_map, comp_id2idx_map = self.construct_id2idx_lookup()
+        i_idx = ref_id2idx_map.get(int(i))
+        j_idx = comp_id2idx_map.get(int(j))
+        if i_idx is None or j_idx is None:
+            return np.nan
+        return float(self.cost_matrix[i_idx, j_idx])
+
+    def construct_assignment(self):
+        """Solves the optimal reference/comparison assignment on this matrix.
+
+        Rows and columns with no overlap anywhere are pruned first: the solver
+        could only ever hand them arbitrary zero-similarity partners, which no
+        consumer uses, and the Hungarian cost grows cubically with size.
+
+        :return: (row_indices, col_indices) into i_ids/j_ids.
+        """
+        row_nz = self.cost_matrix.any(axis=1)
+        col_nz = self.cost_matrix.any(axis=0)
+        if row_nz.all() and col_nz.all():
+            return linear_sum_assignment(-self.cost_matrix)
+        sub_rows, sub_cols = linear_sum_assignment(
+            -self.cost_matrix[np.ix_(row_nz, col_nz)])
+        return np.nonzero(row_nz)[0][sub_rows], np.nonzero(col_nz)[0][sub_cols]
+
+    def serialize(self, filepath):
+        data = {'video_id': self.video_id,
+                'frame': self.frame,
+                'i_ids': self.i_ids,
+                'j_ids': self.j_ids,
+                'cost_matrix': self.cost_matrix}
+        _dump_json(data, filepath)
+
+    @staticmethod
+    def deserialize(filepath):
+        data = _load_json(filepath)
+        return CostMatrixData(data['video_id'], data['frame'],
+                              np.asarray(data['i_ids']), np.asarray(data['j_ids']),
+                              np.asarray(data['cost_matrix']))
+
+
+class HOTA_DATA_PRECURSOR:
+    """Per-alpha TP/FN/FP/LocA accumulators and match counts for HOTA.
+
+    Matches are recorded as chunks of flat (alpha, ref, comp) keys — indices
+    raveled into the dense (n_alphas, nref, ncomp) stack — one entry per
+    matched pair per alpha, and HOTA_DATA.populate folds duplicates with a
+    single bincount. One precursor is shared by every frame of a clip: all
+    updates in _compute_pre_hota are additive, so no per-frame instances or
+    merge step are needed.
+    """
+
+    def __init__(self, n_alphas, nref, ncomp):
+        self.n_alphas = n_alphas
+        # detection tallies are integer counts well below 2^31; LocA is the
+        # only fractional accumulator
+        self.TP = np.zeros(n_alphas, dtype=np.int32)
+        self.FN = np.zeros(n_alphas, dtype=np.int32)
+        self.FP = np.zeros(n_alphas, dtype=np.int32)
+        self.LocA = np.zeros(n_alphas, dtype=np.float32)
+        self.matches_flat_idx = []
+        # number of frames each id appears in, on the clip-level id axes
+        self.ref_id_counts = np.zeros(nref, dtype=np.int32)
+        self.comp_id_counts = np.zeros(ncomp, dtype=np.int32)
+
+
+class HOTA_DATA:
+    """Final HOTA metrics, one value per alpha threshold in array_labels."""
+
+    array_labels = np.arange(0.05, 0.99, 0.05)
+
+    def __init__(self):
+        self.res = {}
+
+    def populate(self, pre_hota_data):
+        """Derives the HOTA metric family from accumulated precursor counts.
+
+        :param pre_hota_data: HOTA_DATA_PRECURSOR summed over all frames.
+        """
+        n_alphas = len(self.array_labels)
+        TP, FN, FP = pre_hota_data.TP, pre_hota_data.FN, pre_hota_data.FP
+        self.res['TP'] = TP
+        self.res['FN'] = FN
+        self.res['FP'] = FP
+        self.res['DetRe'] = TP / np.maximum(1, TP + FN)
+        self.res['DetPr'] = TP / np.maximum(1, TP + FP)
+        self.res['DetA'] = TP / np.maximum(1, TP + FN + FP)
+        self.res['LocA'] = pre_hota_data.LocA / np.maximum(1, TP)
+
+        ref_counts = pre_hota_data.ref_id_counts
+        comp_counts = pre_hota_data.comp_id_counts
+        nref = len(ref_counts)
+        ncomp = len(comp_counts)
+
+        # fold the flat match keys into one dense (alpha, ref, comp) stack;
+        # bincount over raveled keys is a plain counting pass, cheaper than a
+        # scattered np.add.at over three index arrays
+        if pre_hota_data.matches_flat_idx:
+            flat_keys = np.concatenate(pre_hota_data.matches_flat_idx)
+            matches_counts = np.bincount(flat_keys, minlength=n_alphas * nref * ncomp) \
+                .astype(np.float32).reshape(n_alphas, nref, ncomp)
+        else:
+            matches_counts = np.zeros((n_alphas, nref, ncomp), dtype=np.float32)
+
+        # association scores for all alphas in one broadcast over the stack
+        tp_floor = np.maximum(1, TP)
+        ass_a = matches_counts / np.maximum(1, ref_counts[np.newaxis, :, np.newaxis] +
+                                            comp_counts[np.newaxis, np.newaxis, :] - matches_counts)
+        AssA = (matches_counts * ass_a).sum(axis=(1, 2)) / tp_floor
+        ass_re = matches_counts / np.maximum(1, ref_counts[np.newaxis, :, np.newaxis])
+        AssRe = (matches_counts * ass_re).sum(axis=(1, 2)) / tp_floor
+        ass_pr = matches_counts / np.maximum(1, comp_counts[np.newaxis, np.newaxis, :])
+        AssPr = (matches_counts * ass_pr).sum(axis=(1, 2)) / tp_floor
+        self.res['AssA'] = AssA
+        self.res['AssRe'] = AssRe
+        self.res['AssPr'] = AssPr
+        self.res['HOTA'] = np.sqrt(self.res['DetA'] * AssA)
+
+    def serialize(self, filepath):
+        _dump_json(self.res, filepath)
+
+    @staticmethod
+    def deserialize(filepath):
+        res = _load_json(filepath)
+        hota_data = HOTA_DATA()
+        hota_data.res = {k: (np.asarray(v) if isinstance(v, list) else v) for k, v in res.items()}
+        return hota_data
@@ -0,0 +1,447 @@
+import functools
+import multiprocessing
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from data_obj import (CostMatrixData, HOTA_DATA, HOTA_DATA_PRECURSOR, VideoFrameData)
+
+BOX_COLUMN_NAMES = ['bb_left', 'bb_top', 'bb_width', 'bb_height']
+
+try:
+    import numba
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+if _HAVE_NUMBA:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _box_iou_kernel(bboxes1, bboxes2, out):
+        """Writes the pairwise IoU of [left, top, width, height] boxes into out.
+
+        One fused loop per (i, j) pair: no broadcast temporaries, no separate
+        corner-conversion pass."""
+        for i in numba.prange(bboxes1.shape[0]):
+            x1a, y1a = bboxes1[i, 0], bboxes1[i, 1]
+            x2a, y2a = x1a + bboxes1[i, 2], y1a + bboxes1[i, 3]
+            area_a = bboxes1[i, 2] * bboxes1[i, 3]
+            for j in range(bboxes2.shape[0]):
+                x1b, y1b = bboxes2[j, 0], bboxes2[j, 1]
+                w = min(x2a, x1b + bboxes2[j, 2]) - max(x1a, x1b)
+                h = min(y2a, y1b + bboxes2[j, 3]) - max(y1a, y1b)
+                inter = max(w, 0.0) * max(h, 0.0)
+                union = area_a + bboxes2[j, 2] * bboxes2[j, 3] - inter
+                out[i, j] = inter / union if union > 0 else 0.0
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _jaccard_accumulate_kernel(cm, ref_idx, comp_idx, cost_sum, eps):
+        """Adds the Jaccard-normalized cm into cost_sum in one fused pass.
+
+        Normalization and scatter share a single traversal of cm: no
+        denominator matrix, no normalized copy. Rows parallelize safely
+        because each frame's ref_idx values are distinct."""
+        n, m = cm.shape
+        row_sums = np.zeros(n, dtype=cm.dtype)
+        col_sums = np.zeros(m, dtype=cm.dtype)
+        for i in range(n):
+            for j in range(m):
+                value = cm[i, j]
+                row_sums[i] += value
+                col_sums[j] += value
+        for i in numba.prange(n):
+            out_row = ref_idx[i]
+            for j in range(m):
+                denom = row_sums[i] + col_sums[j] - cm[i, j]
+                if denom < eps:
+                    denom = eps
+                cost_sum[out_row, comp_idx[j]] += cm[i, j] / denom
+
+    # warm the compiles once at import so the first frame does not pay for them
+    _box_iou_kernel(np.zeros((2, 4), dtype=np.float32), np.zeros((2, 4), dtype=np.float32),
+                    np.zeros((2, 2), dtype=np.float32))
+    _jaccard_accumulate_kernel(np.zeros((2, 2), dtype=np.float32), np.arange(2), np.arange(2),
+                               np.zeros((2, 2), dtype=np.float32), np.finfo(float).eps)
+
+
+def calculate_box_ious(bboxes1, bboxes2):
+    """Calculates the IoU matrix between two sets of [left, top, width, height] boxes.
+
+    :param bboxes1: (N, 4) array of boxes in [bb_left, bb_top, bb_width, bb_height] layout.
+    :param bboxes2: (M, 4) array of boxes in the same layout.
+    :return: (N, M) array of pairwise IoU values.
+    """
+    # fp32 holds pixel coordinates exactly and halves the kernel's memory
+    # traffic, which is what bounds it for larger frames
+    if _HAVE_NUMBA:
+        out = np.empty((bboxes1.shape[0], bboxes2.shape[0]), dtype=np.float32)
+        _box_iou_kernel(np.ascontiguousarray(bboxes1, dtype=np.float32),
+                        np.ascontiguousarray(bboxes2, dtype=np.float32), out)
+        return out
+    # layout: [bb_left, bb_top, bb_width, bb_height] -> [x1, y1, x2, y2]
+    boxes1 = bboxes1.astype(np.float32)
+    boxes2 = bboxes2.astype(np.float32)
+    boxes1[:, 2] = boxes1[:, 0] + boxes1[:, 2]
+    boxes1[:, 3] = boxes1[:, 1] + boxes1[:, 3]
+    boxes2[:, 2] = boxes2[:, 0] + boxes2[:, 2]
+    boxes2[:, 3] = boxes2[:, 1] + boxes2[:, 3]
+    return calculate_box_ious_xyxy(boxes1, boxes2)
+
+
+def calculate_box_ious_xyxy(boxes1, boxes2):
+    """Calculates the IoU matrix for boxes already in [x1, y1, x2, y2] corner layout.
+
+    Callers that reuse the same boxes for several IoU passes can convert the
+    corners once and go through this entry point directly.
+    """
+    left = np.maximum(boxes1[:, np.newaxis, 0], boxes2[np.newaxis, :, 0])
+    top = np.maximum(boxes1[:, np.newaxis, 1], boxes2[np.newaxis, :, 1])
+    right = np.minimum(boxes1[:, np.newaxis, 2], boxes2[np.newaxis, :, 2])
+    bottom = np.minimum(boxes1[:, np.newaxis, 3], boxes2[np.newaxis, :, 3])
+
+    width = np.maximum(right - left, 0)
+    height = np.maximum(bottom - top, 0)
+    intersection = width * height
+
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+    union = area1[:, np.newaxis] + area2[np.newaxis, :] - intersection
+
+    intersection[union <= 0] = 0
+    union[union <= 0] = 1
+    return intersection / union
+
+
+def normalize_cost_matrix(cost_matrix):
+    """Normalizes a similarity matrix into Jaccard form in place and returns it."""
+    row_sums = cost_matrix.sum(axis=1, keepdims=True)
+    col_sums = cost_matrix.sum(axis=0, keepdims=True)
+    denom = row_sums + col_sums - cost_matrix
+    np.maximum(denom, np.finfo(float).eps, out=denom)
+    cost_matrix /= denom
+    return cost_matrix
+
+
+def extract_per_frame_data(work, class_id=None):
+    """Splits one video's reference and comparison DataFrames into per-frame slices.
+
+    :param work: (video_id, ref_df, comp_df) tuple for one video.
+    :param class_id: when set, only rows of this class are kept.
+    :return: list of VideoFrameData covering the union of both frame ranges.
+    """
+    video_id, ref_df, comp_df = work
+    if class_id is not None:
+        ref_df = ref_df[ref_df['class_id'] == class_id]
+        comp_df = comp_df[comp_df['class_id'] == class_id]
+
+    # one hashed pass over the whole clip replaces per-frame uniqueness checks
+    # in the similarity functions
+    if ref_df.duplicated(['frame', 'id']).any():
+        raise ValueError('Duplicate reference ids within a frame in video {}'.format(video_id))
+    if comp_df.duplicated(['frame', 'id']).any():
+        raise ValueError('Duplicate comparison ids within a frame in video {}'.format(video_id))
+
+    # both sides are sliced on the columns they share, in reference order
+    col_names = [col for col in ref_df.columns if col in comp_df.columns]
+    empty = np.zeros((0, len(col_names)))
+
+    # resolve column positions once here rather than per frame
+    id_idx = col_names.index('id')
+    box_idx = [col_names.index(col) for col in BOX_COLUMN_NAMES]
+    pos_idx = [col_names.index(col) for col in ('lat', 'long')] \
+        if 'lat' in col_names and 'long' in col_names else None
+
+    frames = np.union1d(ref_df['frame'].unique(), comp_df['frame'].unique())
+    # row-position arrays per frame, sliced out of one numpy view of each side;
+    # get_group would rebuild a DataFrame (rows + index + metadata) per frame
+    ref_values = ref_df[col_names].to_numpy()
+    comp_values = comp_df[col_names].to_numpy()
+    ref_groups = ref_df.groupby('frame', sort=False).indices
+    comp_groups = comp_df.groupby('frame', sort=False).indices
+    frame_data = []
+    for frame in frames:
+        ref_idx = ref_groups.get(frame)
+        comp_idx = comp_groups.get(frame)
+        ref_frame_np = ref_values[ref_idx] if ref_idx is not None else empty
+        comp_frame_np = comp_values[comp_idx] if comp_idx is not None else empty
+        frame_data.append(VideoFrameData(video_id, int(frame), ref_frame_np, comp_frame_np,
+                                         col_names, id_idx, box_idx, pos_idx))
+    return frame_data
+
+
+def compute_id_alignment_similarity(dat):
+    """Builds the per-frame IoU similarity matrix between reference and comparison boxes.
+
+    :param dat: VideoFrameData for one frame.
+    :return: CostMatrixData with reference ids on rows and comparison ids on columns.
+    """
+    ref_ids = dat.ref_data[:, dat.id_idx].astype(int)
+    comp_ids = dat.comp_data[:, dat.id_idx].astype(int)
+
+    # frames with nothing on one side produce an empty matrix; skip the IoU
+    # machinery (and its kernel dispatch) entirely
+    if len(ref_ids) == 0 or len(comp_ids) == 0:
+        return CostMatrixData(dat.video_id, dat.frame, ref_ids, comp_ids,
+                              np.zeros((len(ref_ids), len(comp_ids)), dtype=np.float32))
+
+    ref_boxes = dat.ref_data[:, dat.box_idx].astype(float)
+    comp_boxes = dat.comp_data[:, dat.box_idx].astype(float)
+    cost_matrix = calculate_box_ious(ref_boxes, comp_boxes)
+    return CostMatrixData(dat.video_id, dat.frame, ref_ids, comp_ids, cost_matrix)
+
+
+def compute_latlon_alignment_similarity(dat, max_distance=50.0):
+    """Builds the per-frame similarity matrix from geolocated positions.
+
+    Similarity is 1 - distance / max_distance clipped at zero, so co-located
+    objects score 1 and objects further than max_distance apart score 0.
+
+    :param dat: VideoFrameData for one frame; both sides must carry lat/long columns.
+    :param max_distance: distance at which similarity reaches zero.
+    :return: CostMatrixData with reference ids on rows and comparison ids on columns.
+    """
+    if dat.pos_idx is None:
+        raise ValueError('No lat/long columns shared by both sides for video {}'.format(dat.video_id))
+    ref_ids = dat.ref_data[:, dat.id_idx].astype(int)
+    comp_ids = dat.comp_data[:, dat.id_idx].astype(int)
+    ref_pos = dat.ref_data[:, dat.pos_idx].astype(float)
+    comp_pos = dat.comp_data[:, dat.pos_idx].astype(float)
+
+    distances = np.linalg.norm(ref_pos[:, np.newaxis, :] - comp_pos[np.newaxis, :, :], axis=-1)
+    cost_matrix = np.maximum(0.0, 1.0 - distances / max_distance)
+    return CostMatrixData(dat.video_id, dat.frame, ref_ids, comp_ids, cost_matrix)
+
+
+def jaccard_cost_matrices(matrices_list):
+    """Accumulates per-frame similarity matrices into one clip-level Jaccard matrix.
+
+    :param matrices_list: list of per-frame CostMatrixData for a single video.
+    :return: clip-level CostMatrixData over the union of all ids.
+    """
+    # pairwise unions only ever allocate the running union, not a temporary
+    # concatenation of every per-frame id array at once
+    ref_ids = functools.reduce(np.union1d, (data.i_ids for data in matrices_list))
+    comp_ids = functools.reduce(np.union1d, (data.j_ids for data in matrices_list))
+
+    cost_sum = np.zeros((len(ref_ids), len(comp_ids)), dtype=np.float32)
+    i_counts = np.zeros(len(ref_ids), dtype=np.int32)
+    j_counts = np.zeros(len(comp_ids), dtype=np.int32)
+    for data in matrices_list:
+        # the union arrays are sorted, so a binary search maps each frame's
+        # ids to clip-level indices in C instead of per-id dict lookups
+        ref_idx = np.searchsorted(ref_ids, data.i_ids)
+        comp_idx = np.searchsorted(comp_ids, data.j_ids)
+        i_counts[ref_idx] += 1
+        j_counts[comp_idx] += 1
+        if data.cost_matrix.size == 0:
+            continue
+        # normalize out-of-place: the source stays untouched (it is re-read
+        # for the matched similarities later); with numba the normalization
+        # and the scatter fuse into one traversal with no NxM temporaries
+        cm = data.cost_matrix
+        if _HAVE_NUMBA:
+            _jaccard_accumulate_kernel(np.ascontiguousarray(cm), ref_idx, comp_idx,
+                                       cost_sum, np.finfo(float).eps)
+        else:
+            denom = cm.sum(axis=1, keepdims=True) + cm.sum(axis=0, keepdims=True) - cm
+            np.maximum(denom, np.finfo(float).eps, out=denom)
+            np.divide(cm, denom, out=denom)
+            cost_sum[ref_idx[:, np.newaxis], comp_idx[np.newaxis, :]] += denom
+
+    global_cost = cost_sum / np.maximum(
+        1, i_counts[:, np.newaxis] + j_counts[np.newaxis, :] - cost_sum)
+    video_id = matrices_list[0].video_id if matrices_list else None
+    return CostMatrixData(video_id, None, ref_ids, comp_ids, global_cost)
+
+
+def _compute_pre_hota(sim_cost_matrix, global_cost_matrix, gt_to_tracker_ids=None,
+                      perform_match_per_frame=False, out=None):
+    """Computes the per-alpha TP/FN/FP/LocA contributions of a single frame.
+
+    :param sim_cost_matrix: per-frame CostMatrixData.
+    :param global_cost_matrix: clip-level CostMatrixData supplying the compact
+        id axes the per-frame contributions are accumulated on.
+    :param gt_to_tracker_ids: reference-id-indexed array mapping each reference
+        id to its globally assigned comparison id (-1 when unassigned);
+        used when matching is not redone per frame.
+    :param perform_match_per_frame: solve a fresh assignment on this frame
+        instead of reusing the clip-level map.
+    :param out: HOTA_DATA_PRECURSOR to accumulate into; a fresh one is
+        allocated when omitted. Every update below is additive, so feeding
+        one precursor through all frames of a clip sums them without any
+        per-frame accumulator allocations.
+    :return: the updated HOTA_DATA_PRECURSOR.
+    """
+    hota_pre_data = out if out is not None else HOTA_DATA_PRECURSOR(
+        len(HOTA_DATA.array_labels),
+        len(global_cost_matrix.i_ids),
+        len(global_cost_matrix.j_ids))
+    lcl_ref_ids = sim_cost_matrix.i_ids
+    lcl_comp_ids = sim_cost_matrix.j_ids
+    if len(lcl_ref_ids) == 0 and len(lcl_comp_ids) == 0:
+        return hota_pre_data
+
+    ref_id2idx, comp_id2idx = global_cost_matrix.construct_id2idx_arrays()
+    np.add.at(hota_pre_data.ref_id_counts, ref_id2idx[lcl_ref_ids], 1)
+    np.add.at(hota_pre_data.comp_id_counts, comp_id2idx[lcl_comp_ids], 1)
+
+    if len(lcl_ref_ids) == 0 or len(lcl_comp_ids) == 0:
+        # no matches are possible; only the miss tallies move, identically
+        # across all alpha thresholds
+        hota_pre_data.FN += len(lcl_ref_ids)
+        hota_pre_data.FP += len(lcl_comp_ids)
+        return hota_pre_data
+
+    if perform_match_per_frame:
+        rows, cols = sim_cost_matrix.construct_assignment()
+        match_ref_ids = lcl_ref_ids[rows]
+        match_comp_ids = lcl_comp_ids[cols]
+    else:
+        # map every reference id through the clip-level assignment at once and
+        # keep the pairs whose tracker id is present in this frame; per-frame
+        # ids are unique so isin can assume uniqueness
+        mapped_tracker_ids = gt_to_tracker_ids[lcl_ref_ids]
+        valid = (mapped_tracker_ids >= 0) & np.isin(mapped_tracker_ids, lcl_comp_ids,
+                                                    assume_unique=True)
+        match_ref_ids = lcl_ref_ids[valid]
+        match_comp_ids = mapped_tracker_ids[valid]
+
+    # both match id arrays are guaranteed present in this frame's matrix, so
+    # the similarities come out in one fancy-indexing gather
+    lcl_ref_id2idx, lcl_comp_id2idx = sim_cost_matrix.construct_id2idx_arrays()
+    matched_similarity_vals = sim_cost_matrix.cost_matrix[
+        lcl_ref_id2idx[match_ref_ids], lcl_comp_id2idx[match_comp_ids]]
+
+    match_ref_idx = ref_id2idx[match_ref_ids]
+    match_comp_idx = comp_id2idx[match_comp_ids]
+
+    # one (n_alphas, n_matches) threshold comparison replaces the nested
+    # per-alpha/per-match Python loops
+    eps = np.finfo(float).eps
+    mask = matched_similarity_vals[np.newaxis, :] >= (HOTA_DATA.array_labels[:, np.newaxis] - eps)
+    tp = mask.sum(axis=1)
+    hota_pre_data.TP += tp
+    hota_pre_data.FN += len(lcl_ref_ids) - tp
+    hota_pre_data.FP += len(lcl_comp_ids) - tp
+    hota_pre_data.LocA += (mask * matched_similarity_vals[np.newaxis, :]).sum(axis=1)
+
+    alpha_idx, m_idx = np.nonzero(mask)
+    hota_pre_data.matches_flat_idx.append(np.ravel_multi_index(
+        (alpha_idx, match_ref_idx[m_idx], match_comp_idx[m_idx]),
+        (hota_pre_data.n_alphas, len(hota_pre_data.ref_id_counts),
+         len(hota_pre_data.comp_id_counts))))
+    return hota_pre_data
+
+
+def _similarity_into_shared(work):
+    """Worker-side wrapper that writes its cost matrix into a shared block.
+
+    Only the id arrays and matrix placement metadata travel back through the
+    pool's result pipe; the NxM matrix itself never gets pickled.
+
+    :param work: (dat, similarity_fn, shm_name, offset) tuple.
+    :return: (video_id, frame, i_ids, j_ids, shape, dtype, offset).
+    """
+    dat, similarity_fn, shm_name, offset = work
+    data = similarity_fn(dat)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # attaching registers the segment with this worker's resource tracker,
+    # which would race the parent (the owner) to unlink it at exit
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    try:
+        out = np.ndarray(data.cost_matrix.shape, dtype=data.cost_matrix.dtype,
+                         buffer=shm.buf, offset=offset)
+        out[:] = data.cost_matrix
+    finally:
+        shm.close()
+    return (data.video_id, data.frame, data.i_ids, data.j_ids,
+            data.cost_matrix.shape, data.cost_matrix.dtype, offset)
+
+
+def compute_cost_per_video_per_frame(ref_dfs, comp_dfs, class_id=None, num_workers=1,
+                                     similarity_fn=compute_id_alignment_similarity):
+    """Computes the per-frame similarity matrices for every video.
+
+    :param ref_dfs: dict video_id -> reference (ground truth) DataFrame.
+    :param comp_dfs: dict video_id -> comparison (tracker) DataFrame.
+    :param class_id: optional class filter applied to both sides.
+    :param num_workers: worker process count; 1 runs serially.
+    :param similarity_fn: VideoFrameData -> CostMatrixData similarity builder.
+    :return: dict video_id -> list of per-frame CostMatrixData.
+    """
+    frame_extraction_work_queue = []
+    for video_id, ref_df in ref_dfs.items():
+        if video_id not in comp_dfs:
+            continue
+        frame_extraction_work_queue.append((video_id, ref_df, comp_dfs[video_id]))
+
+    if num_workers > 1:
+        with multiprocessing.Pool(num_workers) as pool:
+            per_video_frames = pool.map(
+                functools.partial(extract_per_frame_data, class_id=class_id),
+                frame_extraction_work_queue)
+            all_frames = [dat for frames in per_video_frames for dat in frames]
+
+            # every matrix shape is known before the similarity pass runs, so
+            # one shared block sized for all of them lets the workers write
+            # their results in place instead of pickling NxM floats per frame
+            shapes = [(dat.ref_data.shape[0], dat.comp_data.shape[0]) for dat in all_frames]
+            # slots are sized for float64 as an upper bound; similarity
+            # functions are free to emit narrower matrices into them
+            nbytes = np.asarray([8 * n * m for n, m in shapes], dtype=np.int64)
+            offsets = np.concatenate(([0], np.cumsum(nbytes[:-1]))) if len(nbytes) else nbytes
+            shm = shared_memory.SharedMemory(create=True, size=max(1, int(nbytes.sum())))
+            try:
+                # batch the per-frame tasks so each IPC round-trip amortizes
+                # its pickle overhead over many frames instead of one
+                chunksize = max(1, len(all_frames) // (4 * num_workers))
+                metadata = pool.map(
+                    _similarity_into_shared,
+                    [(dat, similarity_fn, shm.name, int(offset))
+                     for dat, offset in zip(all_frames, offsets)],
+                    chunksize=chunksize)
+            finally:
+                # drop the name right away; the mapping stays valid for as
+                # long as the parent keeps the block open
+                shm.unlink()
+            cost_matrices = []
+            for video_id, frame, i_ids, j_ids, shape, dtype, offset in metadata:
+                cost_matrix = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                cost_matrix_data = CostMatrixData(video_id, frame, i_ids, j_ids, cost_matrix)
+                # keep the shared block alive as long as views of it are
+                cost_matrix_data._shm = shm
+                cost_matrices.append(cost_matrix_data)
+    else:
+        per_video_frames = [extract_per_frame_data(work, class_id)
+                            for work in frame_extraction_work_queue]
+        all_frames = [dat for frames in per_video_frames for dat in frames]
+        cost_matrices = [similarity_fn(dat) for dat in all_frames]
+
+    matrices_per_video = {}
+    for cost_matrix_data in cost_matrices:
+        matrices_per_video.setdefault(cost_matrix_data.video_id, []).append(cost_matrix_data)
+    return matrices_per_video
+
+
+def compute_hota_for_video(frame_matrices):
+    """Aggregates one video's per-frame similarity matrices into HOTA metrics.
+
+    :param frame_matrices: list of per-frame CostMatrixData for the video.
+    :return: populated HOTA_DATA.
+    """
+    global_cost_matrix = jaccard_cost_matrices(frame_matrices)
+    rows, cols = global_cost_matrix.construct_assignment()
+    # reference-id-indexed lookup of the assigned tracker id; -1 = unassigned
+    gt_to_tracker_ids = np.full(int(global_cost_matrix.i_ids.max(initial=0)) + 1, -1,
+                                dtype=np.int64)
+    gt_to_tracker_ids[global_cost_matrix.i_ids[rows]] = global_cost_matrix.j_ids[cols]
+
+    pre_hota_data = HOTA_DATA_PRECURSOR(len(HOTA_DATA.array_labels),
+                                        len(global_cost_matrix.i_ids),
+                                        len(global_cost_matrix.j_ids))
+    for sim_cost_matrix in frame_matrices:
+        _compute_pre_hota(sim_cost_matrix, global_cost_matrix, gt_to_tracker_ids,
+                          out=pre_hota_data)
+
+    hota_data = HOTA_DATA()
+    hota_data.populate(pre_hota_data)
+    return hota_data
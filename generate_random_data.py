@@ -0,0 +1,292 @@
+"""Generates random (plausible but meaningless) tracker submissions for testing."""
+
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import utils
+
+VIDEO_EXTENSIONS = ('.avi', '.mp4', '.mkv')
+
+# frames per streamed row-group block; peak memory is one block of rows
+# regardless of how long the video is
+FRAME_BLOCK_SIZE = 10_000
+
+# random rows are high-entropy, so dictionary encoding and column statistics
+# buy nothing and only cost write CPU; zstd-3 still shrinks the binary columns
+# without a compression-speed cliff. The constant columns are the exception:
+# dictionary-encoding them collapses each page to one entry plus run lengths
+PARQUET_WRITE_KWARGS = {
+    'compression': 'zstd',
+    'compression_level': 3,
+    'row_group_size': 100_000,
+    'use_dictionary': ['class_id', 'lat', 'long', 'alt'],
+    'data_page_size': 1 << 20,
+    'write_statistics': False,
+}
+
+try:
+    import numba
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+if _HAVE_NUMBA:
+    @numba.njit(cache=True)
+    def _sample_ids_kernel(counts, num_subjects, seed, out):
+        """Fills out with counts[i] distinct track ids per frame.
+
+        A partial Fisher-Yates shuffle per frame: only the first counts[i]
+        positions of the id pool are shuffled, giving a uniform sample without
+        materializing a full permutation or any per-frame Python objects."""
+        np.random.seed(seed)
+        pool = np.empty(num_subjects, dtype=np.int64)
+        k = 0
+        for i in range(counts.shape[0]):
+            for t in range(num_subjects):
+                pool[t] = t
+            for t in range(counts[i]):
+                j = t + np.random.randint(0, num_subjects - t)
+                pool[t], pool[j] = pool[j], pool[t]
+                out[k] = pool[t]
+                k += 1
+        return k
+
+    # warm the compile once at import so the first video does not pay for it
+    _sample_ids_kernel(np.ones(1, dtype=np.int64), 2, 0, np.empty(1, dtype=np.int32))
+
+
+def _find_video_files(videos_dirpath):
+    """Collects the per-video media files under videos_dirpath.
+
+    Expects one directory per video containing a media file of the same name.
+
+    :param videos_dirpath: dataset root holding the per-video directories.
+    :return: list of video file paths.
+    """
+    # scandir reuses the stat from the directory read, so the whole walk is
+    # one syscall per directory instead of one per entry
+    video_names = []
+    video_filepaths = []
+    with os.scandir(videos_dirpath) as entries:
+        dir_entries = [entry for entry in entries if entry.is_dir()]
+    for dir_entry in dir_entries:
+        video_names.append(dir_entry.name)
+        with os.scandir(dir_entry.path) as entries:
+            for entry in entries:
+                basename, extension = os.path.splitext(entry.name)
+                # the media file must be named after its own directory; a
+                # looser any-directory match would let vidA/vidB.mp4 stand
+                # in for vidB's missing file
+                if extension in VIDEO_EXTENSIONS and basename == dir_entry.name:
+                    video_filepaths.append(entry.path)
+
+    missing_videos = utils.find_missing_files(
+        video_names,
+        [os.path.splitext(filepath)[0] for filepath in video_filepaths])
+    if missing_videos:
+        raise ValueError('No video file found for: {}'.format(sorted(missing_videos)))
+    return video_filepaths
+
+
+def _load_video_stats(video_filepaths, output_dirpath):
+    """Returns {filepath: (frame_count, width, height)}, probing through a cache.
+
+    The stats are immutable for a given file, so they are persisted in a
+    sidecar next to the output and keyed by (path, mtime_ns, size); warm runs
+    skip the video probes entirely.
+    """
+    cache_filepath = os.path.join(output_dirpath, '.video_stats.json')
+    try:
+        with open(cache_filepath, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    keys = {}
+    for filepath in video_filepaths:
+        file_stat = os.stat(filepath)
+        keys[filepath] = '{}:{}:{}'.format(filepath, file_stat.st_mtime_ns, file_stat.st_size)
+
+    # decoder open releases the GIL, so the cold probes run on threads
+    missing = [filepath for filepath in video_filepaths if keys[filepath] not in cache]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(missing))) as executor:
+            for filepath, probed in zip(missing, executor.map(utils.get_video_stats, missing)):
+                cache[keys[filepath]] = list(probed)
+
+    stats = {filepath: tuple(cache[keys[filepath]]) for filepath in video_filepaths}
+    if missing:
+        with open(cache_filepath, 'w') as f:
+            json.dump(cache, f, indent=2)
+    return stats
+
+
+def _generate_block(rng, block_start, block_frames, num_subjects, width, height):
+    """Draws the rows for one block of frames as a column dict of ndarrays.
+
+    All per-row draws happen as bulk generator calls (one C-level RNG call per
+    column for the whole block) rather than per-row randint/uniform calls; the
+    only remaining Python-level loop samples which track ids appear per frame.
+    """
+    # number of visible subjects per frame, then one flat row block
+    counts = rng.integers(0, num_subjects + 1, size=block_frames)
+    total = int(counts.sum())
+    frame_col = np.repeat(
+        np.arange(block_start, block_start + block_frames, dtype=np.int32), counts)
+
+    # which track ids appear in each frame (distinct within a frame)
+    if _HAVE_NUMBA:
+        object_col = np.empty(total, dtype=np.int32)
+        _sample_ids_kernel(counts, num_subjects, int(rng.integers(1 << 31)), object_col)
+    else:
+        # one bulk key draw replaces a random.sample call per frame: ranking
+        # random keys per row and keeping the first counts[i] positions is a
+        # uniform distinct sample of the id pool
+        keys = rng.random((block_frames, num_subjects))
+        order = np.argsort(keys, axis=1).astype(np.int32)
+        keep = np.arange(num_subjects)[np.newaxis, :] < counts[:, np.newaxis]
+        object_col = order[keep]
+
+    # every column is drawn at its final dtype, so arrow wraps the buffers
+    # as-is: no inference pass, no silent int64/float64 upcasts
+    x = rng.integers(0, width, size=total, dtype=np.int32)
+    y = rng.integers(0, height, size=total, dtype=np.int32)
+    # scaling one uniform draw by the per-row bound keeps every box inside the
+    # frame with a multiply and a cast instead of a variable-bound integer
+    # draw; the floor clamps to one pixel minimum
+    w = np.maximum(1, (rng.random(total) * (width - x)).astype(np.int32))
+    h = np.maximum(1, (rng.random(total) * (height - y)).astype(np.int32))
+
+    return {
+        'frame': frame_col,
+        'object_id': object_col,
+        'class_id': np.zeros(total, dtype=np.int8),
+        'x': x, 'y': y, 'w': w, 'h': h,
+        'score': rng.uniform(0.0, 1.0, size=total),
+        'lat': np.zeros(total),
+        'long': np.zeros(total),
+        'alt': np.zeros(total)}
+
+
+def _generate_one(video_filepath, output_dirpath, num_subjects, stats=None, seed=None,
+                  write_kwargs=None):
+    """Generates and writes the random submission for a single video.
+
+    Rows are streamed to the parquet file one FRAME_BLOCK_SIZE block of frames
+    at a time, so peak memory stays flat no matter how long the video is.
+
+    :param video_filepath: path of the video to generate tracks for.
+    :param output_dirpath: directory the parquet file is written to.
+    :param num_subjects: maximum number of tracks visible in any one frame.
+    :param stats: (frame_count, width, height) when already probed; probed
+        here otherwise.
+    :param seed: seed (or SeedSequence) for this video's generator; fresh OS
+        entropy when None.
+    :param write_kwargs: overrides for the parquet writer settings; defaults
+        to PARQUET_WRITE_KWARGS.
+    """
+    rng = np.random.default_rng(seed)
+
+    frame_count, width, height = stats if stats is not None else utils.get_video_stats(video_filepath)
+    video_name = os.path.splitext(os.path.basename(video_filepath))[0]
+    output_filepath = os.path.join(output_dirpath, video_name + '.parquet')
+
+    write_kwargs = dict(PARQUET_WRITE_KWARGS if write_kwargs is None else write_kwargs)
+    # row_group_size is a per-write_table argument, not a writer option
+    row_group_size = write_kwargs.pop('row_group_size', None)
+
+    writer = None
+    try:
+        # range(0, 0) for a zero-frame video would never open the writer, so
+        # force a single empty block to still produce a valid (empty) file
+        for block_start in range(0, max(frame_count, 1), FRAME_BLOCK_SIZE):
+            block_frames = min(FRAME_BLOCK_SIZE, frame_count - block_start)
+            columns = _generate_block(rng, block_start, block_frames,
+                                      num_subjects, width, height)
+            table = pa.Table.from_pydict(columns)
+            if writer is None:
+                writer = pq.ParquetWriter(output_filepath, table.schema, **write_kwargs)
+            writer.write_table(table, row_group_size=row_group_size)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def generate_random_data(videos_dirpath, output_dirpath, num_subjects=10, seed=None,
+                         frame_counts=None, frame_sizes=None):
+    """Writes one random submission parquet file per video.
+
+    Videos are fully independent (own probe, own rows, own output file), so
+    they are fanned out over a process pool.
+
+    :param videos_dirpath: dataset root holding the per-video directories.
+    :param output_dirpath: directory the per-video parquet files are written to.
+    :param num_subjects: maximum number of tracks visible in any one frame.
+    :param seed: makes the run reproducible when given; each video gets an
+        independent child seed so the pooled workers never share RNG state.
+    :param frame_counts: optional {video_name: frame_count} manifest; the
+        synthetic rows only need plausible frame counts, so trusting a
+        manifest skips opening the videos entirely.
+    :param frame_sizes: optional {video_name: (width, height)} manifest; a
+        video is only exempt from probing when both manifests cover it.
+    """
+    # created once up front so the workers never race makedirs
+    os.makedirs(output_dirpath, exist_ok=True)
+    video_filepaths = _find_video_files(videos_dirpath)
+
+    # take stats from the manifests where they cover a video, probe (through
+    # the sidecar cache) only the remainder -- all in the parent, so the
+    # workers never touch the videos at all
+    manifest_stats = {}
+    if frame_counts is not None and frame_sizes is not None:
+        for filepath in video_filepaths:
+            video_name = os.path.splitext(os.path.basename(filepath))[0]
+            if video_name in frame_counts and video_name in frame_sizes:
+                width, height = frame_sizes[video_name]
+                manifest_stats[filepath] = (frame_counts[video_name], width, height)
+    to_probe = [filepath for filepath in video_filepaths if filepath not in manifest_stats]
+    video_stats = _load_video_stats(to_probe, output_dirpath) if to_probe else {}
+    video_stats.update(manifest_stats)
+    # spawn one child seed per video: workers stay statistically independent,
+    # and a fixed seed reproduces the exact same submission regardless of how
+    # the videos are distributed over the pool
+    child_seeds = np.random.SeedSequence(seed).spawn(len(video_filepaths))
+
+    if len(video_filepaths) > 1:
+        n_workers = min(len(video_filepaths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            list(executor.map(_generate_one, video_filepaths,
+                              itertools.repeat(output_dirpath),
+                              itertools.repeat(num_subjects),
+                              [video_stats[filepath] for filepath in video_filepaths],
+                              child_seeds))
+    else:
+        for video_filepath, child_seed in zip(video_filepaths, child_seeds):
+            _generate_one(video_filepath, output_dirpath, num_subjects,
+                          stats=video_stats[video_filepath], seed=child_seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a random VLINCS submission.')
+    parser.add_argument('--videos-dirpath', type=str, required=True,
+                        help='Dataset root containing the per-video directories.')
+    parser.add_argument('--output-dirpath', type=str, required=True,
+                        help='Directory the per-video parquet files are written to.')
+    parser.add_argument('--num-subjects', type=int, default=10,
+                        help='Maximum number of tracks visible in any one frame.')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed making the generated submission reproducible.')
+    args = parser.parse_args()
+    generate_random_data(args.videos_dirpath, args.output_dirpath,
+                         num_subjects=args.num_subjects, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
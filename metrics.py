@@ -0,0 +1,144 @@
+"""Computes HOTA tracking metrics for a directory of tracker results."""
+
+import argparse
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
+
+import fast_hota_utils
+import utils
+
+GROUND_TRUTH_COLUMNS = ['frame', 'id', 'bb_left', 'bb_top', 'bb_width', 'bb_height',
+                        'conf', 'class_id', 'visibility']
+# submission schema -> internal ground-truth naming
+RESULTS_COLUMN_RENAMES = {'object_id': 'id', 'x': 'bb_left', 'y': 'bb_top',
+                          'w': 'bb_width', 'h': 'bb_height'}
+DEFAULT_METRIC_LIST = ['HOTA', 'DetA', 'AssA', 'DetRe', 'DetPr', 'AssRe', 'AssPr', 'LocA']
+
+
+BOX_COLUMNS = ['bb_left', 'bb_top', 'bb_width', 'bb_height']
+
+
+GROUND_TRUTH_COLUMN_TYPES = {
+    'frame': pa.int32(), 'id': pa.int32(), 'bb_left': pa.int32(), 'bb_top': pa.int32(),
+    'bb_width': pa.int32(), 'bb_height': pa.int32(), 'conf': pa.float64(),
+    'class_id': pa.int32(), 'visibility': pa.float64()}
+
+
+def load_annotation(annotation_filepath):
+    """Loads a MOT-style ground truth annotation csv into a DataFrame.
+
+    Arrow's multithreaded csv reader parses the file with the target dtypes in
+    place, so no per-column cast pass is needed afterwards.
+    """
+    table = pacsv.read_csv(
+        annotation_filepath,
+        read_options=pacsv.ReadOptions(column_names=GROUND_TRUTH_COLUMNS),
+        convert_options=pacsv.ConvertOptions(column_types=GROUND_TRUTH_COLUMN_TYPES))
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def modify_columns(df):
+    """Renames submission columns to the internal ground-truth naming.
+
+    Box coordinates are downcast to int32: they cannot overflow it, and the
+    IoU kernels downstream are memory-bound, so halving the bytes per element
+    roughly halves their traffic.
+    """
+    df = df.rename(columns=RESULTS_COLUMN_RENAMES)
+    for col in BOX_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(np.int32)
+    return df
+
+
+def _computes_latlon_metrics(results_dict):
+    """Determines whether any result file carries real lat/long geolocations.
+
+    Both geolocation columns are scanned together in one numpy pass over
+    contiguous memory (non-NaN and non-zero), returning as soon as any file
+    contains a real coordinate.
+    """
+    for df in results_dict.values():
+        cols = [col for col in ('lat', 'long') if col in df.columns]
+        if not cols:
+            continue
+        arr = df[cols].to_numpy(dtype=np.float64)
+        if np.any((~np.isnan(arr)) & (arr != 0)):
+            return True
+    return False
+
+
+def _scalar(value):
+    """Collapses a per-alpha metric array to the single reported value."""
+    return float(value.mean()) if isinstance(value, np.ndarray) else float(value)
+
+
+def _average_hota_over_videos(per_video_hota):
+    """Averages per-alpha metric arrays across videos."""
+    return {metric_name: np.mean([hota.res[metric_name] for hota in per_video_hota], axis=0)
+            for metric_name in per_video_hota[0].res.keys()}
+
+
+def compute_metrics(ground_truth_dirpath, results_dirpath, metric_list=None, num_workers=1):
+    """Computes the HOTA metric family for a directory of tracker results.
+
+    :param ground_truth_dirpath: directory of per-video ground truth data.
+    :param results_dirpath: directory of per-video tracker parquet files.
+    :param metric_list: metric names to report; defaults to DEFAULT_METRIC_LIST.
+    :param num_workers: worker count handed to the per-frame cost computation.
+    :return: dict of metric name -> scalar, prefixed with the similarity used.
+    """
+    if metric_list is None:
+        metric_list = DEFAULT_METRIC_LIST
+
+    ground_truth_dict = utils.load_ground_truth(ground_truth_dirpath)
+    results_dict = utils.load_results(results_dirpath)
+    results_dict = {name: modify_columns(df) for name, df in results_dict.items()}
+
+    computes_latlon_metrics = _computes_latlon_metrics(results_dict)
+
+    matrices_per_video = fast_hota_utils.compute_cost_per_video_per_frame(
+        ground_truth_dict, results_dict, num_workers=num_workers)
+    per_video_hota = [fast_hota_utils.compute_hota_for_video(frame_matrices)
+                      for frame_matrices in matrices_per_video.values()]
+    if len(per_video_hota) == 0:
+        raise ValueError('No videos with both ground truth and results were found.')
+    iou_global_hota_data = _average_hota_over_videos(per_video_hota)
+
+    result_ret = {}
+    for metric_name in metric_list:
+        result_ret['iou_' + metric_name] = _scalar(iou_global_hota_data[metric_name])
+
+    if computes_latlon_metrics:
+        latlon_matrices_per_video = fast_hota_utils.compute_cost_per_video_per_frame(
+            ground_truth_dict, results_dict, num_workers=num_workers,
+            similarity_fn=fast_hota_utils.compute_latlon_alignment_similarity)
+        per_video_hota = [fast_hota_utils.compute_hota_for_video(frame_matrices)
+                          for frame_matrices in latlon_matrices_per_video.values()]
+        latlon_global_hota_data = _average_hota_over_videos(per_video_hota)
+        for metric_name in metric_list:
+            result_ret['latlon_' + metric_name] = _scalar(latlon_global_hota_data[metric_name])
+
+    return result_ret
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute HOTA metrics for tracker results.')
+    parser.add_argument('--ground-truth-dirpath', type=str, required=True,
+                        help='Directory containing the per-video ground truth data.')
+    parser.add_argument('--results-dirpath', type=str, required=True,
+                        help='Directory containing the per-video tracker parquet files.')
+    parser.add_argument('--num-workers', type=int, default=1,
+                        help='Number of worker processes for the cost computation.')
+    args = parser.parse_args()
+
+    results = compute_metrics(args.ground_truth_dirpath, args.results_dirpath,
+                              num_workers=args.num_workers)
+    for metric_name, value in sorted(results.items()):
+        print('{}: {:.4f}'.format(metric_name, value))
+
+
+if __name__ == '__main__':
+    main()
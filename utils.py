@@ -0,0 +1,106 @@
+"""Shared helpers for loading videos, ground truth and tracker results."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow.parquet as pq
+
+# PyAV reads the container header without standing up a full decoder, which
+# is what dominates an OpenCV metadata-only probe
+try:
+    import av
+    _HAVE_AV = True
+except ImportError:
+    _HAVE_AV = False
+
+
+def get_video_stats(video_filepath):
+    """Returns (frame_count, width, height) for a video file."""
+    if _HAVE_AV:
+        try:
+            with av.open(video_filepath) as container:
+                stream = container.streams.video[0]
+                if stream.frames and stream.codec_context.width:
+                    return (stream.frames,
+                            stream.codec_context.width,
+                            stream.codec_context.height)
+        except (OSError, IndexError):
+            pass
+    # fall back to OpenCV for containers PyAV cannot read (or when the
+    # header does not carry a frame count); imported lazily since cv2 costs
+    # hundreds of ms of cold-start that the loader-only callers never need
+    import cv2
+    cap = cv2.VideoCapture(video_filepath)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    return frame_count, width, height
+
+
+def find_missing_files(reference_list, filepath_list):
+    """Returns the names from reference_list that have no matching file in filepath_list.
+
+    :return: frozenset of missing names.
+    """
+    reference_set = (reference_list if isinstance(reference_list, (set, frozenset))
+                     else set(reference_list))
+    # rpartition keeps everything after the last separator (the whole string
+    # when there is none), matching basename without its per-call dispatch
+    filename_set = {filepath.rpartition(os.sep)[2] for filepath in filepath_list}
+    return frozenset(reference_set - filename_set)
+
+
+def _read_parquet(filepath):
+    """Reads one parquet file into a DataFrame straight through pyarrow."""
+    # memory-map the file and skip pandas block consolidation so pages are
+    # only faulted in for the columns actually touched
+    return pq.read_table(filepath, memory_map=True).to_pandas(
+        split_blocks=True, self_destruct=True)
+
+
+def _read_parquet_optional(filepath):
+    """Reads one parquet file, returning None when it does not exist."""
+    try:
+        return _read_parquet(filepath)
+    except FileNotFoundError:
+        return None
+
+
+def load_ground_truth(ground_truth_dirpath):
+    """Loads the per-video ground truth parquet files into a dict keyed by video name."""
+    video_names = []
+    filepaths = []
+    # hoist the fspath/sep resolution out of the loop; os.path.join re-does it
+    # per call, which adds up over thousands of videos
+    base = os.fspath(ground_truth_dirpath)
+    sep = os.sep
+    for video_name in sorted(os.listdir(ground_truth_dirpath)):
+        video_names.append(video_name)
+        filepaths.append(f'{base}{sep}{video_name}{sep}gt.parquet')
+    if not filepaths:
+        return {}
+    # parquet decode releases the GIL, so threads scale the many-small-files
+    # case; missing gt files surface as a FileNotFoundError inside the read
+    # rather than paying a separate stat per video up front
+    with ThreadPoolExecutor(max_workers=min(32, len(filepaths))) as executor:
+        dfs = list(executor.map(_read_parquet_optional, filepaths))
+    return {name: df for name, df in zip(video_names, dfs) if df is not None}
+
+
+def load_results(results_dirpath):
+    """Loads the per-video tracker result parquet files into a dict keyed by video name."""
+    video_names = []
+    filepaths = []
+    base = os.fspath(results_dirpath)
+    sep = os.sep
+    for filename in sorted(os.listdir(results_dirpath)):
+        if not filename.endswith('.parquet'):
+            continue
+        video_names.append(os.path.splitext(filename)[0])
+        filepaths.append(f'{base}{sep}{filename}')
+    if not filepaths:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(32, len(filepaths))) as executor:
+        dfs = list(executor.map(_read_parquet, filepaths))
+    return dict(zip(video_names, dfs))
@@ -0,0 +1,109 @@
+"""Validates and packages a directory of per-video parquet result files for submission."""
+
+import argparse
+import os
+import shutil
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# every column a submission parquet file may contain; all of them must be numeric
+VALID_COLUMN_NAMES = frozenset(
+    ['frame', 'object_id', 'class_id', 'x', 'y', 'w', 'h', 'score', 'lat', 'long', 'alt'])
+
+
+def _validate_one(filepath):
+    """Validates a single parquet file; returns a list of error strings."""
+    filename = os.path.basename(filepath)
+    errors = []
+    # inspect the parquet schema instead of materializing a DataFrame; the
+    # common all-numeric case is decided without reading any data pages
+    parquet_file = pq.ParquetFile(filepath, memory_map=True)
+    schema = parquet_file.schema_arrow
+
+    unexpected = set(schema.names) - VALID_COLUMN_NAMES
+    if unexpected:
+        errors.append('{}: unexpected columns {}'.format(filename, sorted(unexpected)))
+
+    for field in schema:
+        if field.name not in VALID_COLUMN_NAMES:
+            continue
+        if pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+            continue
+        # non-numeric physical type: read just this column and see whether
+        # its values can be safely cast to floats
+        column = parquet_file.read(columns=[field.name]).column(0)
+        try:
+            pc.cast(column, pa.float64(), safe=True)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            errors.append('{}: column {} is not numeric (type {})'.format(
+                filename, field.name, field.type))
+    return errors
+
+
+def validate_submission(submission_dirpath):
+    """Checks every parquet file in the submission directory for schema problems.
+
+    Files are independent, so they are validated in parallel: a process pool
+    for large submissions, a thread pool for small ones (PyArrow releases the
+    GIL during decode, so threads are enough when pool start-up would dominate).
+
+    :param submission_dirpath: directory containing one parquet file per video.
+    :return: list of human-readable error strings; empty when the submission is valid.
+    """
+    errors = []
+    filenames = sorted(f for f in os.listdir(submission_dirpath) if f.endswith('.parquet'))
+    if len(filenames) == 0:
+        errors.append('No parquet files found in {}'.format(submission_dirpath))
+        return errors
+
+    filepaths = [os.path.join(submission_dirpath, f) for f in filenames]
+    n_workers = min(len(filepaths), os.cpu_count() or 1)
+    executor_cls = ProcessPoolExecutor if len(filepaths) > 4 else ThreadPoolExecutor
+    with executor_cls(max_workers=n_workers) as executor:
+        for file_errors in executor.map(_validate_one, filepaths):
+            errors.extend(file_errors)
+    return errors
+
+
+def package_submission(submission_dirpath, output_filepath):
+    """Zips the parquet files in the submission directory into a single archive.
+
+    Parquet files are already compressed, so they are stored uncompressed and
+    streamed into the archive in chunks rather than read whole into memory.
+    """
+    filenames = sorted(f for f in os.listdir(submission_dirpath) if f.endswith('.parquet'))
+    with zipfile.ZipFile(output_filepath, 'w', compression=zipfile.ZIP_STORED,
+                         allowZip64=True) as zip_file:
+        for filename in filenames:
+            filepath = os.path.join(submission_dirpath, filename)
+            with open(filepath, 'rb') as fin, \
+                    zip_file.open(filename, 'w', force_zip64=True) as fout:
+                shutil.copyfileobj(fin, fout, length=1 << 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate and package a VLINCS submission.')
+    parser.add_argument('--submission-dirpath', type=str, required=True,
+                        help='Directory containing the per-video parquet result files.')
+    parser.add_argument('--output-filepath', type=str, default=None,
+                        help='Where to write the submission zip; skipped when omitted.')
+    args = parser.parse_args()
+
+    errors = validate_submission(args.submission_dirpath)
+    if errors:
+        for error in errors:
+            print(error)
+        exit(1)
+    print('Submission is valid.')
+
+    if args.output_filepath is not None:
+        package_submission(args.submission_dirpath, args.output_filepath)
+        print('Submission packaged into {}'.format(args.output_filepath))
+
+
+if __name__ == '__main__':
+    main()